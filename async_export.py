@@ -0,0 +1,105 @@
+import asyncio
+import functools
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from pydocx_text_exporter import PyDocXTextExporter
+
+default_executor = None
+
+
+def get_default_executor():
+    """
+    Return the process pool the conversions run on unless another executor
+    is given. It is created on first use and shared by all callers.
+    """
+    global default_executor
+    if default_executor is None:
+        default_executor = ProcessPoolExecutor()
+    return default_executor
+
+
+def export_to_docx_dto(source, limits=None, **kwargs):
+    """
+    Export `source`, a path or the bytes of a docx, to a `DocxDto`. The
+    keyword arguments are passed to `PyDocXTextExporter.export_to_docx_dto`.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with PyDocXTextExporter(source, limits=limits) as exporter:
+        return exporter.export_to_docx_dto(**kwargs)
+
+
+async def export_to_docx_dto_async(source, executor=None, limits=None, **kwargs):
+    """
+    Run `export_to_docx_dto` on `executor` (the default process pool if None)
+    without blocking the event loop.
+
+    Cancelling the returned coroutine cancels the conversion if it has not
+    started yet; a running conversion can't be interrupted and finishes in
+    the background, use `limits` to bound its time.
+    """
+    if executor is None:
+        executor = get_default_executor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(export_to_docx_dto, source, limits=limits, **kwargs),
+    )
+
+
+async def iter_sources(sources):
+    if hasattr(sources, '__aiter__'):
+        async for source in sources:
+            yield source
+    else:
+        for source in sources:
+            yield source
+
+
+async def export_batch_async(sources, concurrency=4, executor=None, limits=None, **kwargs):
+    """
+    Export the paths or docx bytes of the (async) iterable `sources`, yielding
+    `(source, result)` pairs in completion order. `result` is the `DocxDto`,
+    or the exception the conversion raised.
+
+    At most `concurrency` conversions are in flight. The next source is only
+    taken once a conversion finished and its result was consumed, so a slow
+    consumer or producer applies backpressure. Closing or cancelling the
+    generator cancels the pending conversions.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1, got {!r}'.format(concurrency))
+    pending = set()
+
+    async def export(source):
+        try:
+            result = await export_to_docx_dto_async(
+                source,
+                executor=executor,
+                limits=limits,
+                **kwargs
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = e
+        return source, result
+
+    try:
+        async for source in iter_sources(sources):
+            while len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(export(source)))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        # Wait for the cancellations, so no task is left pending
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -42,28 +42,97 @@ class Paragraph:
             for span in self.text_spans
         )
 
+    def normalize_spans(self):
+        """
+        Merge adjacent spans with the same style and fold whitespace-only spans
+        into the preceding span (or the following one at the start of the
+        paragraph), since their style is not visible. Runs in linear time.
+        """
+        # [text_style, [text, ...]] of the normalized spans
+        merged = []
+        leading_whitespace = []
+        for span in self.text_spans:
+            if not span.text:
+                continue
+            if not span.text.strip():
+                if merged:
+                    merged[-1][1].append(span.text)
+                else:
+                    leading_whitespace.append(span.text)
+                continue
+            if merged and merged[-1][0] == span.text_style:
+                merged[-1][1].append(span.text)
+            else:
+                merged.append([span.text_style, leading_whitespace + [span.text]])
+                leading_whitespace = []
+
+        if leading_whitespace:
+            # The paragraph is whitespace only
+            merged.append(['', leading_whitespace])
+
+        self.text_spans = [
+            TextSpan(''.join(texts), text_style=text_style)
+            for text_style, texts in merged
+        ]
+
+
+class Heading:
+    def __init__(self, level: int, title: str, paragraph_index: int):
+        self.level = level
+        self.title = title
+        # Index in `DocxDto.content` of the paragraph following the heading.
+        # Equals `len(content)` if no paragraph follows, e.g. for a heading at
+        # the end of the document.
+        self.paragraph_index = paragraph_index
 
 
 class DocxDto:
-    def __init__(self, metadata: Metadata = None, content: List[Paragraph] = None):
+    # Number of leading paragraphs `extract_metadata_from_content` consumes
+    metadata_paragraph_count = 7
+
+    def __init__(
+            self,
+            metadata: Metadata = None,
+            content: List[Paragraph] = None,
+            outline: List[Heading] = None
+    ):
         if content is None:
             content = []
+        if outline is None:
+            outline = []
         self.metadata = metadata
         self.content = content
+        self.outline = outline
 
     def append_paragraph(self, paragraph):
         self.content.append(paragraph)
 
+    def append_heading(self, heading):
+        self.outline.append(heading)
+
+    def normalize(self):
+        for paragraph in self.content:
+            paragraph.normalize_spans()
+
     def extract_metadata_from_content(self):
+        header = self.content[:self.metadata_paragraph_count]
+        del self.content[:self.metadata_paragraph_count]
+
         # first item is irrelevant (`Originalskript des Vortrags`)
-        self.content.pop(0)
-
-        title = self.content.pop(0).to_text()
-        loc_dat = self.content.pop(0).to_text().split(', ')
-        id = self.content.pop(0).to_text()
-        type = self.content.pop(0).to_text()
-        category = self.content.pop(0).to_text()
-        img = self.content.pop(0).to_text().split('src="')[1].split('" width')[0]
+        title = header[1].to_text()
+        loc_dat = header[2].to_text().split(', ')
+        id = header[3].to_text()
+        type = header[4].to_text()
+        category = header[5].to_text()
+        img = header[6].to_text().split('src="')[1].split('" width')[0]
+
+        # Point the outline at the remaining content
+        outline = []
+        for heading in self.outline:
+            heading.paragraph_index -= self.metadata_paragraph_count
+            if heading.paragraph_index >= 0:
+                outline.append(heading)
+        self.outline = outline
 
         self.metadata = Metadata(
             doc_id=id.replace('Code:', '').strip(),
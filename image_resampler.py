@@ -0,0 +1,89 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ImageResampler(object):
+    """
+    Downscale images to the size they are rendered at and re-encode them.
+
+    Images are decoded and encoded on a thread pool. Results are cached by the
+    content of the image and the target size, so an image that appears
+    repeatedly (in one or several documents) is only processed once. The
+    cache holds the `cache_size` most recently used results.
+
+    :param image_format: The format the images are encoded to, e.g. `webp`,
+        `jpeg` or `png`.
+    :param quality: The encoder quality, for the formats that support it.
+    :param scale: The ratio between image pixels and rendered pixels, e.g. 2
+        to stay sharp on high density displays.
+    :param cache_size: The number of resampled images kept in the cache.
+    """
+
+    def __init__(
+            self,
+            image_format='webp',
+            quality=80,
+            scale=1.0,
+            max_workers=None,
+            cache_size=64,
+    ):
+        if Image is None:
+            raise ImportError('Resampling images requires Pillow (`pip install pillow`)')
+        self.image_format = image_format.lower()
+        self.quality = quality
+        self.scale = scale
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+
+    @property
+    def extension(self):
+        if self.image_format == 'jpg':
+            return 'jpeg'
+        return self.image_format
+
+    def submit(self, data, width, height):
+        """
+        Schedule the resampling of the image `data` to `width` x `height`
+        pixels. Returns a future of the encoded image.
+        """
+        key = (hashlib.sha1(data).hexdigest(), round(width), round(height))
+        with self.lock:
+            future = self.cache.get(key)
+            if future is None:
+                future = self.executor.submit(self.resample, data, width, height)
+                self.cache[key] = future
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(key)
+        return future
+
+    def resample(self, data, width, height):
+        image = Image.open(io.BytesIO(data))
+        size = (
+            max(1, round(width * self.scale)),
+            max(1, round(height * self.scale)),
+        )
+        # Never upscale
+        if size[0] < image.width and size[1] < image.height:
+            image = image.resize(size, Image.LANCZOS)
+
+        if self.extension == 'jpeg' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        output = io.BytesIO()
+        image.save(output, format=self.extension, quality=self.quality)
+        return output.getvalue()
+
+    def shutdown(self):
+        self.executor.shutdown()
@@ -0,0 +1,85 @@
+import zipfile
+from io import BytesIO
+
+from pydocx.exceptions import MalformedDocxException
+from pydocx.openxml.packaging import WordprocessingDocument
+from pydocx.packaging import ZipPackage
+
+
+class LazyZipStreams(dict):
+    """
+    Maps part uris to their streams, reading and decompressing a part from the
+    zip file only when its stream is first requested.
+
+    `check_part_size` is called with the uncompressed size of a part before it
+    is decompressed, and may raise to refuse it.
+    """
+
+    def __init__(self, zip_file, root_uri, check_part_size=None):
+        super(LazyZipStreams, self).__init__()
+        self.zip_file = zip_file
+        self.root_uri = root_uri
+        self.check_part_size = check_part_size
+
+    def get_size(self, uri):
+        if uri in self:
+            return len(self[uri].getvalue())
+        return self.zip_file.getinfo(uri[len(self.root_uri):]).file_size
+
+    def __missing__(self, uri):
+        if self.check_part_size is not None:
+            self.check_part_size(self.get_size(uri))
+        stream = BytesIO(self.zip_file.read(uri[len(self.root_uri):]))
+        self[uri] = stream
+        return stream
+
+
+class LazyZipPackage(ZipPackage):
+    """
+    A `ZipPackage` that only reads the parts that are used, instead of
+    decompressing every part (including all images) when it is opened.
+
+    The zip file stays open until `close` is called.
+    """
+
+    def __init__(self, path, check_part_size=None):
+        super(LazyZipPackage, self).__init__(path=path)
+        self.check_part_size = check_part_size
+        self.zip_file = None
+
+    def _load_parts(self):
+        if self.path is None:
+            return
+        try:
+            self.zip_file = zipfile.ZipFile(self.path)
+        except zipfile.BadZipfile:
+            raise MalformedDocxException()
+        self.streams = LazyZipStreams(
+            self.zip_file,
+            self.uri,
+            check_part_size=self.check_part_size,
+        )
+        for name in self.zip_file.namelist():
+            self.create_part(self.uri + name)
+
+    def get_part_size(self, uri):
+        """
+        Return the uncompressed size of the part at `uri` without reading it.
+        """
+        self._ensure_parts_are_loaded()
+        return self.streams.get_size(uri)
+
+    def close(self):
+        """
+        Close the zip file. Parts that were not read before can't be read
+        afterwards.
+        """
+        if self.zip_file is not None:
+            self.zip_file.close()
+            self.zip_file = None
+
+
+class LazyWordprocessingDocument(WordprocessingDocument):
+    def __init__(self, path, check_part_size=None):
+        super(LazyWordprocessingDocument, self).__init__(path=path)
+        self.package = LazyZipPackage(path=path, check_part_size=check_part_size)
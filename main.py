@@ -1,23 +1,482 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
 import jsonpickle
 
-from pydocx_text_exporter import PyDocXTextExporter
+from pydocx_text_exporter import (
+    ExportContext,
+    ExportLimitExceeded,
+    ExportLimits,
+    PyDocXTextExporter,
+)
 
 path_raw = './docs/raw/example_template.docx'
 # path_raw = './docs/raw/IVOx0012 Selbstbewusstsein&Selbstvertrauen finden 2013-06.docx'
 path = './docs/example_template.dart'.replace(" ", "")
 # path = './docs/IVOx0012 Selbstbewusstsein&Selbstvertrauen finden 2013-06.dart'.replace(" ", "")
 
-if __name__ == '__main__':
+raw_dir = './docs/raw'
+out_dir = './docs'
+report_path = './docs/batch_report.jsonl'
+catalog_path = './docs/catalog.dart'
+# Bookkeeping of the incremental catalog updates, not shipped with the catalog
+catalog_state_path = './docs/catalog_state.json'
+# The header images of the catalog entries
+catalog_images_dir = './docs/images'
+
+# Seconds between two scans of the raw directory in watch mode
+poll_interval = 0.2
+# Seconds a file must stay unchanged before it is exported, so that a burst
+# of saves results in a single export
+debounce_interval = 0.5
+
+# Guards against malformed or huge documents tying up the conversion
+limits = ExportLimits(
+    max_input_size=50 * 1024 * 1024,
+    max_paragraphs=50000,
+    max_image_bytes=200 * 1024 * 1024,
+    time_budget=60,
+    max_part_size=100 * 1024 * 1024,
+)
+
+
+def get_output_path(docx_path):
+    name, _ = os.path.splitext(os.path.basename(docx_path))
+    return os.path.join(out_dir, name + '.dart').replace(" ", "")
+
+
+def write_atomically(file_path, content, mode='w'):
+    """
+    Write to a temporary file next to `file_path` and move it into place, so
+    readers never see a partially written file.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as file:
+            file.write(content)
+        # `mkstemp` creates the file readable by the owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
 
-    exporter = PyDocXTextExporter(open(path_raw, 'rb'))
 
-    docx = exporter.export_to_docx_dto()
+def convert(docx_file, dart_path, record=None):
+    """
+    Export `docx_file` to the dart map at `dart_path`. If a `record` dict is
+    given, it is updated with the timings and counts of the conversion.
+    """
+    context = ExportContext()
+    with PyDocXTextExporter(docx_file, limits=limits) as exporter:
+        started = time.perf_counter()
+        # Parse the main document up front, so it is timed separately
+        exporter.main_document_part.document
+        parsed = time.perf_counter()
 
-    # html = exporter.export()
-    # print(exporter.export())
+        docx = exporter.export_to_docx_dto(context=context)
+        exported = time.perf_counter()
 
     jsonStr = jsonpickle.encode(docx, unpicklable=False, make_refs=False)
-    print(jsonStr)
     variable_name = docx.metadata.title.replace(" ", "")
-    with open(path, 'w') as file:
-        file.write(f"Map {variable_name} = {jsonStr};")
+    write_atomically(dart_path, f"Map {variable_name} = {jsonStr};")
+    serialized = time.perf_counter()
+
+    if record is not None:
+        record.update({
+            'parse_time': parsed - started,
+            'export_time': exported - parsed,
+            'serialization_time': serialized - exported,
+            'total_time': serialized - started,
+            'paragraphs': context.paragraph_count,
+            'spans': sum(len(paragraph.text_spans) for paragraph in docx.content),
+            'tables': context.table_count,
+            'images': context.image_count,
+            'image_bytes': context.image_bytes,
+            'output_size': len(jsonStr.encode()),
+        })
+    return jsonStr
+
+
+def read_dart_map(dart_path):
+    with open(dart_path) as file:
+        content = file.read()
+    # `Map <variable name> = <json>;`
+    _, _, json_str = content.partition(' = ')
+    return json.loads(json_str.rstrip().rstrip(';'))
+
+
+def write_catalog_image(name, img):
+    """
+    Write the header image `img`, a data uri, to `catalog_images_dir`. Returns
+    the path of the written image, or None if `img` is not a data uri.
+    """
+    header, separator, data = img.partition(';base64,')
+    if not separator or not header.startswith('data:image/'):
+        return
+    extension = header[len('data:image/'):]
+    os.makedirs(catalog_images_dir, exist_ok=True)
+    image_path = os.path.join(catalog_images_dir, f"{name}.{extension}")
+    write_atomically(image_path, base64.b64decode(data), mode='wb')
+    return image_path
+
+
+def update_catalog(directory=None):
+    """
+    Update the catalog with the metadata of the dart maps in `directory`,
+    `out_dir` by default.
+
+    The catalog lists the metadata of all documents sorted by id, with lookup
+    tables from category and type to the indices of their documents. Header
+    images are written to `catalog_images_dir` and referenced by their path.
+    Only the dart maps modified since the last update, according to the
+    modification times kept in `catalog_state_path`, are read. Returns whether
+    the catalog changed.
+    """
+    if directory is None:
+        directory = out_dir
+
+    try:
+        with open(catalog_state_path) as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        state = {}
+
+    changed = not os.path.exists(catalog_path)
+    seen = set()
+    catalog_name = os.path.basename(catalog_path)
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.dart') or entry.name == catalog_name:
+            continue
+        seen.add(entry.name)
+        mtime = entry.stat().st_mtime_ns
+        if entry.name in state and state[entry.name]['mtime'] == mtime:
+            continue
+        try:
+            metadata = read_dart_map(entry.path)['metadata']
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"Skipping {entry.path} in the catalog, it has no metadata")
+            continue
+        name, _ = os.path.splitext(entry.name)
+        image_path = write_catalog_image(name, metadata.get('img') or '')
+        if image_path is not None:
+            # Referenced relative to the catalog
+            metadata['img'] = os.path.relpath(
+                image_path,
+                os.path.dirname(catalog_path),
+            ).replace(os.sep, '/')
+        state[entry.name] = {'mtime': mtime, 'metadata': metadata, 'image': image_path}
+        changed = True
+
+    for source in set(state) - seen:
+        image_path = state.pop(source)['image']
+        if image_path is not None and os.path.exists(image_path):
+            os.remove(image_path)
+        changed = True
+
+    if not changed:
+        return False
+
+    documents = [
+        state[source]['metadata']
+        for source in sorted(state, key=lambda source: (state[source]['metadata']['id'], source))
+    ]
+    by_category = {}
+    by_type = {}
+    for index, document in enumerate(documents):
+        by_category.setdefault(document['category'], []).append(index)
+        by_type.setdefault(document['type'], []).append(index)
+
+    catalog = {
+        'documents': documents,
+        'by_category': by_category,
+        'by_type': by_type,
+    }
+    jsonStr = json.dumps(catalog, separators=(',', ':'), sort_keys=True)
+    write_atomically(catalog_path, f"Map catalog = {jsonStr};")
+    write_atomically(catalog_state_path, json.dumps(state, sort_keys=True))
+    return True
+
+
+def is_docx(file_name):
+    # `~$` files are the lock files word keeps next to open documents
+    return file_name.endswith('.docx') and not file_name.startswith('~$')
+
+
+def convert_all(directory, report=None, trace_memory=False):
+    """
+    Export every document in `directory`. A document that fails does not stop
+    the batch; a list of errors, one dict per failed document, is returned.
+
+    If a `report` path is given, a JSON line with the timings and counts of
+    every document is written to it, and the `summarize_report` summary to
+    the `.summary.json` file next to it. With `trace_memory`, the report also
+    records the peak traced memory of every document; tracing slows the
+    conversion down, so measure the timings in a separate run.
+    """
+    errors = []
+    records = []
+    trace_memory = bool(report) and trace_memory
+    if trace_memory:
+        tracemalloc.start()
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not entry.is_file() or not is_docx(entry.name):
+            continue
+        record = {
+            'path': entry.path,
+            'input_size': entry.stat().st_size,
+        }
+        if trace_memory:
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+        try:
+            with open(entry.path, 'rb') as file:
+                convert(file, get_output_path(entry.path), record=record)
+        except ExportLimitExceeded as e:
+            errors.append({
+                'path': entry.path,
+                'error': 'limit_exceeded',
+                'limit': e.limit,
+                'maximum': e.maximum,
+                'value': e.value,
+            })
+        except Exception as e:
+            errors.append({
+                'path': entry.path,
+                'error': type(e).__name__,
+                'message': str(e),
+            })
+        if trace_memory:
+            _, memory_peak = tracemalloc.get_traced_memory()
+            record['peak_memory'] = memory_peak - memory_before
+        if report:
+            if errors and errors[-1]['path'] == entry.path:
+                record.update(errors[-1])
+            records.append(record)
+
+    update_catalog()
+
+    if trace_memory:
+        tracemalloc.stop()
+    if report:
+        write_atomically(report, ''.join(json.dumps(record) + '\n' for record in records))
+        summary = json.dumps(summarize_report(records), indent=2)
+        write_atomically(get_summary_path(report), summary + '\n')
+        print(summary)
+    return errors
+
+
+def get_percentile(values, percentile):
+    # Nearest-rank percentile of the sorted `values`
+    index = max(0, -(-len(values) * percentile // 100) - 1)
+    return values[int(index)]
+
+
+def summarize_report(records, outliers=5):
+    """
+    Summarize the records of `convert_all` with percentiles of the timings
+    and memory (if it was traced), the slowest documents, and the largest
+    documents by traced memory, or by input size if memory was not traced,
+    and by image bytes.
+    """
+    converted = [record for record in records if 'error' not in record]
+
+    summary = {
+        'documents': len(records),
+        'failed': len(records) - len(converted),
+    }
+    if not converted:
+        return summary
+
+    memory_traced = 'peak_memory' in converted[0]
+    keys = ['total_time', 'parse_time', 'export_time', 'serialization_time']
+    if memory_traced:
+        keys.append('peak_memory')
+    for key in keys:
+        values = sorted(record[key] for record in converted)
+        summary[key] = {
+            f'p{percentile}': get_percentile(values, percentile)
+            for percentile in (50, 90, 99)
+        }
+        summary[key]['max'] = values[-1]
+
+    for name, key in (
+            ('slowest', 'total_time'),
+            ('largest', 'peak_memory' if memory_traced else 'input_size'),
+            ('most_image_bytes', 'image_bytes'),
+    ):
+        summary[name] = [
+            {'path': record['path'], key: record[key]}
+            for record in sorted(converted, key=lambda record: record[key], reverse=True)[:outliers]
+        ]
+    return summary
+
+
+def get_summary_path(report):
+    # `batch_report.jsonl` -> `batch_report.summary.json`
+    root, _ = os.path.splitext(report)
+    return root + '.summary.json'
+
+
+def report_span_normalization(directory):
+    """
+    Print how much `DocxDto.normalize` shrinks the serialized output of every
+    document in `directory`, and in total.
+
+    The baseline is the output of `export_to_docx_dto(normalize=False)`: the
+    current collector without the merging of spans. Like the collector before
+    normalization was added, it starts a span at every style tag, but it also
+    keeps the whitespace-only spans and the text of nested styles the old
+    collector dropped or mislabelled. The figures therefore measure the effect
+    of normalization alone, not the size difference to output written by
+    older versions.
+    """
+    total_raw = total_normalized = 0
+    failed = 0
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not entry.is_file() or not is_docx(entry.name):
+            continue
+        sizes = []
+        try:
+            for normalize in (False, True):
+                with open(entry.path, 'rb') as file, PyDocXTextExporter(file, limits=limits) as exporter:
+                    docx = exporter.export_to_docx_dto(normalize=normalize)
+                spans = sum(len(paragraph.text_spans) for paragraph in docx.content)
+                size = len(jsonpickle.encode(docx, unpicklable=False, make_refs=False).encode())
+                sizes.append((spans, size))
+        except Exception as e:
+            # A broken document does not stop the report, like in `convert_all`
+            failed += 1
+            print(f"{entry.name}: failed to export: {e!r}")
+            continue
+        (raw_spans, raw_size), (spans, size) = sizes
+        total_raw += raw_size
+        total_normalized += size
+        print(f"{entry.name}: {raw_spans} -> {spans} spans, {raw_size} -> {size} bytes normalized "
+              f"({100 * (raw_size - size) / raw_size:.1f}% smaller)")
+    if total_raw:
+        print(f"Total: {total_raw} -> {total_normalized} bytes normalized "
+              f"({100 * (total_raw - total_normalized) / total_raw:.1f}% smaller)")
+    if failed:
+        print(f"Failed documents: {failed}")
+
+
+def is_up_to_date(docx_path):
+    try:
+        return os.path.getmtime(get_output_path(docx_path)) >= os.path.getmtime(docx_path)
+    except OSError:
+        return False
+
+
+def watch(directory):
+    """
+    Poll `directory` and re-export every document whose content changed. The
+    output of a deleted document is removed.
+
+    Only the directory listing is stat-ed on each scan; a document is read and
+    hashed once its size or modification time stopped changing for
+    `debounce_interval`, and only exported if its content differs from the
+    last export.
+    """
+    stats = {}
+    digests = {}
+    pending = {}
+
+    print(f"Watching {directory}")
+    update_catalog()
+    while True:
+        now = time.monotonic()
+        changed = False
+        seen = set()
+        for entry in os.scandir(directory):
+            if not entry.is_file() or not is_docx(entry.name):
+                continue
+            seen.add(entry.path)
+            stat = entry.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if entry.path not in stats and is_up_to_date(entry.path):
+                # Exported before the watch started
+                stats[entry.path] = signature
+            elif stats.get(entry.path) != signature:
+                stats[entry.path] = signature
+                pending[entry.path] = now
+
+        for docx_path in set(stats) - seen:
+            del stats[docx_path]
+            digests.pop(docx_path, None)
+            pending.pop(docx_path, None)
+            try:
+                os.remove(get_output_path(docx_path))
+            except FileNotFoundError:
+                continue
+            changed = True
+            print(f"Removed the output of {docx_path}")
+
+        for docx_path, changed_at in list(pending.items()):
+            if now - changed_at < debounce_interval:
+                continue
+            del pending[docx_path]
+            try:
+                with open(docx_path, 'rb') as file:
+                    data = file.read()
+            except OSError:
+                continue
+            digest = hashlib.sha1(data).hexdigest()
+            if digests.get(docx_path) == digest:
+                continue
+            try:
+                convert(io.BytesIO(data), get_output_path(docx_path))
+            except Exception as e:
+                # Likely saved while incomplete, retried on the next change
+                print(f"Failed to export {docx_path}: {e!r}")
+                continue
+            digests[docx_path] = digest
+            changed = True
+            print(f"Exported {docx_path}")
+
+        if changed:
+            update_catalog()
+
+        time.sleep(poll_interval)
+
+
+if __name__ == '__main__':
+
+    if sys.argv[1:2] == ['watch']:
+        watch(sys.argv[2] if len(sys.argv) > 2 else raw_dir)
+        sys.exit()
+
+    if sys.argv[1:2] == ['batch']:
+        # `batch [directory] [report] [--trace-memory]`
+        arguments = [argument for argument in sys.argv[2:] if argument != '--trace-memory']
+        batch_errors = convert_all(
+            arguments[0] if len(arguments) > 0 else raw_dir,
+            report=arguments[1] if len(arguments) > 1 else report_path,
+            trace_memory='--trace-memory' in sys.argv,
+        )
+        for error in batch_errors:
+            print(json.dumps(error))
+        sys.exit(1 if batch_errors else 0)
+
+    if sys.argv[1:2] == ['catalog']:
+        update_catalog()
+        sys.exit()
+
+    if sys.argv[1:2] == ['span-report']:
+        report_span_normalization(sys.argv[2] if len(sys.argv) > 2 else raw_dir)
+        sys.exit()
+
+    # html = PyDocXTextExporter(open(path_raw, 'rb')).export()
+    # print(html)
+
+    with open(path_raw, 'rb') as file:
+        jsonStr = convert(file, path)
+    print(jsonStr)
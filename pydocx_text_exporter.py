@@ -7,8 +7,14 @@ from __future__ import (
 )
 
 import base64
+import contextlib
+import functools
+import html
 import itertools
+import os
 import posixpath
+import threading
+import time
 from itertools import chain
 
 from more_itertools import peekable, spy
@@ -30,7 +36,18 @@ from pydocx.util.xml import (
     convert_dictionary_to_style_fragment,
 )
 
-from docx_dto import DocxDto, Paragraph, TextSpan, Metadata
+from docx_dto import DocxDto, Heading, Paragraph, TextSpan, Metadata
+from lazy_zip_package import LazyWordprocessingDocument
+
+# Ancestors exposed by the `ExportContext` attribute of the same name while
+# their descendants are exported
+ANCESTOR_CONTEXT_ATTRIBUTES = {
+    wordprocessing.Paragraph: 'paragraph',
+    wordprocessing.Table: 'table',
+    NumberingItem: 'numbering_item',
+    wordprocessing.Footnote: 'footnote',
+    wordprocessing.SdtBlock: 'sdt_block',
+}
 
 
 def convert_twips_to_ems(value):
@@ -45,6 +62,53 @@ def convert_emus_to_pixels(emus):
     return emus / EMUS_PER_PIXEL
 
 
+def convert_length_to_pixels(length):
+    """
+    Convert a CSS length in `px` or `pt` to pixels. Return None for any other
+    unit.
+
+    >>> convert_length_to_pixels('96px')
+    96.0
+    >>> convert_length_to_pixels('72pt')
+    96.0
+    """
+    if not length:
+        return
+    units_per_pixel = {
+        'px': 1,
+        'pt': 0.75,
+    }
+    value, unit = length[:-2], length[-2:]
+    if unit not in units_per_pixel:
+        return
+    try:
+        return float(value) / units_per_pixel[unit]
+    except ValueError:
+        return
+
+
+def get_text_style(style_tags):
+    """
+    Combine the names of nested style tags into the `TextSpan.text_style` of
+    the text they wrap.
+
+    >>> get_text_style(['strong', 'em'])
+    'em strong'
+    >>> get_text_style([])
+    ''
+    """
+    return ' '.join(sorted(set(style_tags)))
+
+
+def contains_image(node):
+    """
+    Return whether `node` or one of its descendants is an image.
+    """
+    if isinstance(node, (wordprocessing.Drawing, wordprocessing.Picture)):
+        return True
+    return any(contains_image(child) for child in getattr(node, 'children', None) or ())
+
+
 def get_first_from_sequence(sequence, default=None):
     """
     Given a sequence, return the first item in the sequence. If the sequence is
@@ -213,16 +277,227 @@ class HtmlTag(object):
     def is_hr_tag(maybe_span_tag):
         return HtmlTag.is_tag(maybe_span_tag, 'hr')
 
+    @staticmethod
+    def is_heading_tag(maybe_heading_tag):
+        return isinstance(maybe_heading_tag, HtmlTag) and maybe_heading_tag.tag in (
+            'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+        )
+
     @staticmethod
     def is_tag(this, other):
         return isinstance(this, HtmlTag) and this.tag == other
 
 
+class ExportLimitExceeded(Exception):
+    """
+    Raised when an export exceeds one of its `ExportLimits`. The export is
+    aborted; `limit` is the name of the exceeded limit.
+    """
+
+    def __init__(self, limit, maximum, value):
+        super(ExportLimitExceeded, self).__init__(
+            '{limit} exceeded: {value} > {maximum}'.format(
+                limit=limit,
+                value=value,
+                maximum=maximum,
+            )
+        )
+        self.limit = limit
+        self.maximum = maximum
+        self.value = value
+
+
+class ExportLimits(object):
+    """
+    Resource limits of a single export. A limit of None is not enforced.
+
+    :param max_input_size: Maximum size of the docx file in bytes.
+    :param max_part_size: Maximum uncompressed size in bytes of a single part
+        of the docx (e.g. the main document or an image), checked before the
+        part is decompressed.
+    :param max_paragraphs: Maximum number of paragraphs.
+    :param max_image_bytes: Maximum total size of the embedded images in bytes.
+    :param time_budget: Maximum wall-clock time of an export in seconds.
+    """
+
+    def __init__(
+            self,
+            max_input_size=None,
+            max_paragraphs=None,
+            max_image_bytes=None,
+            time_budget=None,
+            max_part_size=None,
+    ):
+        self.max_input_size = max_input_size
+        self.max_part_size = max_part_size
+        self.max_paragraphs = max_paragraphs
+        self.max_image_bytes = max_image_bytes
+        self.time_budget = time_budget
+
+    @staticmethod
+    def check(limit, maximum, value):
+        if maximum is not None and value > maximum:
+            raise ExportLimitExceeded(limit, maximum, value)
+
+
+def get_input_size(path):
+    """
+    Return the size in bytes of a file given by path or as file object.
+    """
+    if hasattr(path, 'seek'):
+        position = path.tell()
+        size = path.seek(0, os.SEEK_END)
+        path.seek(position)
+        return size
+    return os.path.getsize(path)
+
+
+class BodySelection(object):
+    """
+    Selects the top-level elements (paragraphs, tables, ...) of the body to
+    export. Elements that are not selected are skipped without being exported,
+    and the body is not traversed past the last selected element.
+
+    The first `keep_first` elements are always selected, e.g. to keep the
+    metadata header of a document. Elements are counted as they appear in the
+    body; an element may export to no paragraph (an empty one) or to several
+    (a table).
+    """
+
+    def __init__(self, keep_first=0):
+        self.keep_first = keep_first
+
+    def select(self, children, exporter):
+        children = iter(children)
+        for child in itertools.islice(children, self.keep_first):
+            yield child
+        for child in self.select_remaining(children, exporter):
+            yield child
+
+    def select_remaining(self, children, exporter):
+        return children
+
+
+class BodyRange(BodySelection):
+    """
+    Select the body elements from index `start` up to `stop` (exclusive,
+    None for the end of the body), counted after the `keep_first` elements.
+    """
+
+    def __init__(self, start=0, stop=None, keep_first=0):
+        super(BodyRange, self).__init__(keep_first=keep_first)
+        self.start = start
+        self.stop = stop
+
+    def select_remaining(self, children, exporter):
+        return itertools.islice(children, self.start, self.stop)
+
+
+class BodySection(BodySelection):
+    """
+    Select the heading with the text `heading` and the body elements up to the
+    next heading of the same or a higher level.
+    """
+
+    def __init__(self, heading, keep_first=0):
+        super(BodySection, self).__init__(keep_first=keep_first)
+        self.heading = heading.strip()
+
+    def select_remaining(self, children, exporter):
+        section_level = None
+        for child in children:
+            level = exporter.get_heading_level(child)
+            if section_level is None:
+                if level is not None and exporter.get_heading_title(child) == self.heading:
+                    section_level = level
+                    yield child
+            elif level is not None and level <= section_level:
+                return
+            else:
+                yield child
+
+
+class ExportContext(object):
+    """
+    The mutable state of a single export. Every call to
+    `PyDocXTextExporter.yield_export_results` gets its own context, so
+    interleaved or concurrent exports on one exporter don't see each other's
+    state.
+    """
+
+    def __init__(self):
+        # State of the `PyDocXExporter` base class
+        self.first_pass = False
+        self.footnote_tracker = []
+        self.captured_runs = None
+        self.complex_field_runs = []
+
+        self.table_cell_rowspan_tracking = {}
+        self.in_table_cell = False
+        self.hyperlink_depth = 0
+        # Reference images by their part uri instead of reading them
+        self.image_references = False
+        # Futures of the images resampled in the first pass, by (part uri,
+        # width, height), so the rendering pass doesn't read them again
+        self.resampled_images = {}
+        # An optional `BodySelection`
+        self.body_selection = None
+
+        # The nearest ancestors of the node being exported, see
+        # `ANCESTOR_CONTEXT_ATTRIBUTES`
+        self.paragraph = None
+        self.table = None
+        self.numbering_item = None
+        self.footnote = None
+        self.sdt_block = None
+
+        # Counted separately for the first and the rendering pass
+        self.paragraph_count = 0
+        self.image_bytes = 0
+        # Counted in the rendering pass only
+        self.table_count = 0
+        self.image_count = 0
+        self.deadline = None
+
+
+def context_attribute(name):
+    """
+    Expose the attribute `name` of the active `ExportContext` as an attribute
+    of the exporter.
+    """
+    def getter(self):
+        return getattr(self.context, name)
+
+    def setter(self, value):
+        setattr(self.context, name, value)
+
+    return property(getter, setter)
+
+
 class PyDocXTextExporter(PyDocXExporter):
+    first_pass = context_attribute('first_pass')
+    footnote_tracker = context_attribute('footnote_tracker')
+    captured_runs = context_attribute('captured_runs')
+    complex_field_runs = context_attribute('complex_field_runs')
+    table_cell_rowspan_tracking = context_attribute('table_cell_rowspan_tracking')
+    in_table_cell = context_attribute('in_table_cell')
+
     def __init__(self, *args, **kwargs):
+        # Must exist before the base class initializes the context attributes
+        self.local = threading.local()
+        self.lock = threading.RLock()
+        # An optional `image_resampler.ImageResampler`
+        self.image_resampler = kwargs.pop('image_resampler', None)
+        self.limits = kwargs.pop('limits', None) or ExportLimits()
         super(PyDocXTextExporter, self).__init__(*args, **kwargs)
-        self.table_cell_rowspan_tracking = {}
-        self.in_table_cell = False
+        # Ids of the body elements the first pass already processed
+        self.prepared_body_children = set()
+        # The only run styles applied to the runs of a heading
+        self.heading_run_styles = {
+            self.export_run_property_italic,
+            self.export_run_property_hidden,
+            self.export_run_property_vanish,
+        }
         self.heading_level_conversion_map = {
             'heading 1': 'h1',
             'heading 2': 'h2',
@@ -233,6 +508,19 @@ class PyDocXTextExporter(PyDocXExporter):
         }
         self.default_heading_level = 'h6'
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the docx file. The document can't be exported afterwards.
+        """
+        if self._document is not None:
+            self._document.package.close()
+
     def head(self):
         tag = HtmlTag('head')
         results = chain(self.meta(), self.style())
@@ -268,23 +556,207 @@ class PyDocXTextExporter(PyDocXExporter):
     def meta(self):
         yield HtmlTag('meta', charset='utf-8', allow_self_closing=True)
 
-    def export(self):
+    @property
+    def context(self):
+        context = getattr(self.local, 'context', None)
+        if context is None:
+            context = self.local.context = ExportContext()
+        return context
+
+    def yield_export_results(self, context=None):
+        """
+        Yield the results of a new export with its own `ExportContext`. Pass a
+        fresh `context` to inspect its counters after the export.
+
+        The context is activated on every step of the generator, and steps are
+        serialized by `self.lock`, since the document tree is shared between
+        all exports of this exporter. The lock is held for every step of every
+        export, so threads sharing an exporter take turns instead of running in
+        parallel; use an exporter per thread (or a process pool) to convert
+        documents in parallel.
+        """
+        if context is None:
+            context = ExportContext()
+        if self.limits.time_budget is not None:
+            context.deadline = time.monotonic() + self.limits.time_budget
+        results = super(PyDocXTextExporter, self).export()
+        while True:
+            with self.activate_context(context):
+                try:
+                    result = next(results)
+                except StopIteration:
+                    return
+            yield result
+
+    @contextlib.contextmanager
+    def activate_context(self, context):
+        """
+        Make `context` the active context of this thread while holding
+        `self.lock`.
+        """
+        with self.lock:
+            previous_context = getattr(self.local, 'context', None)
+            self.local.context = context
+            try:
+                yield context
+            finally:
+                self.local.context = previous_context
+
+    def _post_first_pass_processing(self):
+        super(PyDocXTextExporter, self)._post_first_pass_processing()
+        self.context.paragraph_count = 0
+        self.context.image_bytes = 0
+
+    def load_document(self):
+        ExportLimits.check(
+            'max_input_size',
+            self.limits.max_input_size,
+            get_input_size(self.path),
+        )
+        # Parts are only read from the zip once they are used
+        self.document = LazyWordprocessingDocument(
+            path=self.path,
+            check_part_size=functools.partial(
+                ExportLimits.check,
+                'max_part_size',
+                self.limits.max_part_size,
+            ),
+        )
+        return self.document
+
+    def export_node(self, node):
+        deadline = self.context.deadline
+        if deadline is not None and time.monotonic() > deadline:
+            time_budget = self.limits.time_budget
+            raise ExportLimitExceeded(
+                'time_budget',
+                time_budget,
+                time_budget + time.monotonic() - deadline,
+            )
+        results = super(PyDocXTextExporter, self).export_node(node)
+        attribute = ANCESTOR_CONTEXT_ATTRIBUTES.get(type(node))
+        if attribute is None:
+            return results
+        return self.yield_with_ancestor(attribute, node, results)
+
+    def yield_with_ancestor(self, attribute, node, results):
+        """
+        Expose `node` as the context `attribute` while its results are
+        generated, so handlers don't have to walk up the tree to find it.
+        """
+        context = self.context
+        outer_node = getattr(context, attribute)
+        setattr(context, attribute, node)
+        try:
+            for result in results:
+                yield result
+        finally:
+            setattr(context, attribute, outer_node)
+
+    def export(self, context=None):
         return ''.join(
             result.to_html() if isinstance(result, HtmlTag)
             else result
-            for result in super(PyDocXTextExporter, self).export()
+            for result in self.yield_export_results(context=context)
         )
 
-    def export_to_docx_dto(self):
+    def export_to(self, fp, buffer_size=64 * 1024, context=None):
+        """
+        Write the HTML export to the file-like object `fp` while it is
+        generated. Fragments are buffered and written once `buffer_size`
+        characters are collected, so memory is bounded by the buffer (and the
+        largest single fragment, e.g. an inline image) instead of the
+        document.
+        """
+        buffer = []
+        buffered = 0
+        for result in self.yield_export_results(context=context):
+            if isinstance(result, HtmlTag):
+                result = result.to_html()
+            buffer.append(result)
+            buffered += len(result)
+            if buffered >= buffer_size:
+                fp.write(''.join(buffer))
+                buffer = []
+                buffered = 0
+        if buffer:
+            fp.write(''.join(buffer))
+
+    def export_to_docx_dto(
+            self,
+            normalize=True,
+            context=None,
+            image_references=False,
+            inline_header_image=True,
+            paragraph_range=None,
+            section=None,
+    ):
+        """
+        Export the document to a `DocxDto`. Unless `normalize` is False, the
+        spans of every paragraph are coalesced with `Paragraph.normalize_spans`.
+
+        With `image_references`, images are not read from the docx; their
+        `src` is the uri of their part. The header image of the metadata is
+        still inlined, unless `inline_header_image` is False.
+
+        Only a part of the body is exported if `paragraph_range`, a
+        `(start, stop)` index range of the top-level body elements after the
+        metadata header, or `section`, the title of a heading, is given. See
+        `BodyRange` and `BodySection`. The header and the elements that are
+        not selected are skipped in both passes of the export. The outline
+        indices point at the returned content.
+        """
+        if context is None:
+            context = ExportContext()
+        context.image_references = image_references
+        if paragraph_range is not None or section is not None:
+            with self.activate_context(context):
+                header_element_count = self.get_header_element_count()
+            if paragraph_range is not None:
+                start, stop = paragraph_range
+                context.body_selection = BodyRange(
+                    start,
+                    stop,
+                    keep_first=header_element_count,
+                )
+            else:
+                context.body_selection = BodySection(
+                    section,
+                    keep_first=header_element_count,
+                )
         docx = DocxDto()
 
         current_paragraph = None
-        open_style_tag = False
+        open_style_tags = []
         str_buffer = ''
-        results = super(PyDocXTextExporter, self).export()
+        # The text of the heading being exported, if any
+        heading_text = None
+        # Whether each span open in the heading hides its text
+        heading_spans = []
+        results = self.yield_export_results(context=context)
         for result in results:
             if not isinstance(result, HtmlTag):
                 str_buffer += result
+                if heading_text is not None and not any(heading_spans):
+                    heading_text.append(result)
+            elif HtmlTag.is_heading_tag(result):
+                if not result.closed:
+                    heading_text = []
+                    heading_spans = []
+                elif heading_text is not None:
+                    # Headings are not part of the content, they point at the
+                    # paragraph that follows them
+                    docx.append_heading(Heading(
+                        level=int(result.tag[1:]),
+                        title=html.unescape(''.join(heading_text)).strip(),
+                        paragraph_index=len(docx.content),
+                    ))
+                    heading_text = None
+            elif HtmlTag.is_span_tag(result) and heading_text is not None:
+                if not result.closed:
+                    heading_spans.append(result.attrs.get('class') == 'pydocx-hidden')
+                elif heading_spans:
+                    heading_spans.pop()
             elif HtmlTag.is_paragraph_tag(result):
                 if current_paragraph is not None:
                     if str_buffer.strip():
@@ -293,20 +765,32 @@ class PyDocXTextExporter(PyDocXExporter):
                     current_paragraph = None
                 else:
                     current_paragraph = Paragraph()
+                open_style_tags = []
                 str_buffer = ''
             elif HtmlTag.is_style_tag(result) and current_paragraph is not None:
-                if open_style_tag is True:
-                    current_paragraph.append_span(TextSpan(str_buffer, text_style=result.tag))
-                    open_style_tag = False
-                else:
-                    if str_buffer.strip():
-                        current_paragraph.append_span(TextSpan(str_buffer))
-                    open_style_tag = True
+                if str_buffer:
+                    current_paragraph.append_span(TextSpan(
+                        str_buffer,
+                        text_style=get_text_style(open_style_tags),
+                    ))
+                if not result.closed:
+                    open_style_tags.append(result.tag)
+                elif result.tag in open_style_tags:
+                    open_style_tags.remove(result.tag)
                 str_buffer = ''
             else:
                 str_buffer += result.to_text()
 
         docx.extract_metadata_from_content()
+        if image_references and inline_header_image:
+            # Read the image as part of this export, so it is counted against
+            # its limits
+            with self.activate_context(context):
+                img = self.get_image_source_by_uri(docx.metadata.img)
+            if img:
+                docx.metadata.img = img
+        if normalize:
+            docx.normalize()
 
         return docx
 
@@ -321,6 +805,75 @@ class PyDocXTextExporter(PyDocXExporter):
             sequence.append(results)
         return tag.apply(chain(*sequence))
 
+    def yield_body_children(self, body):
+        children = body.children
+        body_selection = self.context.body_selection
+        if body_selection is not None:
+            children = body_selection.select(children, self)
+        if self.first_pass:
+            children = self.yield_unprepared_body_children(children)
+        return self.yield_numbering_spans(children)
+
+    def yield_unprepared_body_children(self, children):
+        # The first pass rewrites parts of the document tree (alternate
+        # content, complex fields), which must only happen once per element
+        for child in children:
+            if id(child) not in self.prepared_body_children:
+                self.prepared_body_children.add(id(child))
+                yield child
+
+    def get_header_element_count(self):
+        """
+        Return the number of top-level body elements of the metadata header
+        read by `DocxDto.extract_metadata_from_content`. The header ends with
+        the paragraph of the header image; empty paragraphs before it are not
+        exported, so the header can span more than
+        `DocxDto.metadata_paragraph_count` elements.
+        """
+        body = self.main_document_part.document.body
+        for index, child in enumerate(body.children):
+            if self.get_heading_level(child) is not None:
+                # Headings follow the header
+                break
+            if contains_image(child):
+                return index + 1
+        return DocxDto.metadata_paragraph_count
+
+    def get_heading_title(self, paragraph):
+        """
+        Return the visible text of a heading paragraph, as in its
+        `Heading.title`.
+        """
+        def yield_visible_text(node):
+            if isinstance(node, wordprocessing.Text):
+                yield node.text or ''
+                return
+            if isinstance(node, wordprocessing.Run):
+                properties = node.effective_properties
+                if properties and (properties.vanish or properties.hidden):
+                    return
+            for child in getattr(node, 'children', None) or ():
+                for text in yield_visible_text(child):
+                    yield text
+
+        return ''.join(yield_visible_text(paragraph)).strip()
+
+    def get_heading_level(self, node):
+        """
+        Return the level (1 to 6) of a heading paragraph, or None if `node`
+        is not a heading.
+        """
+        if not isinstance(node, wordprocessing.Paragraph):
+            return
+        heading_style = node.heading_style
+        if not heading_style:
+            return
+        tag = self.heading_level_conversion_map.get(
+            heading_style.name.lower(),
+            self.default_heading_level,
+        )
+        return int(tag[1:])
+
     def export_body(self, body):
         results = super(PyDocXTextExporter, self).export_body(body)
         tag = HtmlTag('body')
@@ -354,14 +907,14 @@ class PyDocXTextExporter(PyDocXExporter):
                 return tag
         if self.in_table_cell:
             return
-        if paragraph.has_structured_document_parent():
+        if self.context.sdt_block is not None:
             return
         if isinstance(paragraph.parent, NumberingItem):
             return
         return HtmlTag('p')
 
     def get_heading_tag(self, paragraph):
-        if paragraph.has_ancestor(NumberingItem):
+        if self.context.numbering_item is not None:
             # Force-bold headings that appear in list items
             return HtmlTag('strong')
         heading_style = paragraph.heading_style
@@ -372,6 +925,14 @@ class PyDocXTextExporter(PyDocXExporter):
         return HtmlTag(tag)
 
     def export_paragraph(self, paragraph, merge_style_tags=True):
+        context = self.context
+        context.paragraph_count += 1
+        ExportLimits.check(
+            'max_paragraphs',
+            self.limits.max_paragraphs,
+            context.paragraph_count,
+        )
+
         results = super(PyDocXTextExporter, self).export_paragraph(paragraph)
 
         results = is_not_empty_and_not_only_whitespace(results)
@@ -499,21 +1060,15 @@ class PyDocXTextExporter(PyDocXExporter):
         return results
 
     def get_run_styles_to_apply(self, run):
-        parent_paragraph = run.get_first_ancestor(wordprocessing.Paragraph)
+        parent_paragraph = self.context.paragraph
         if parent_paragraph and parent_paragraph.heading_style:
-            results = self.get_run_styles_to_apply_for_heading(run)
-        else:
-            results = super(PyDocXTextExporter, self).get_run_styles_to_apply(run)
-        for result in results:
-            yield result
+            return self.get_run_styles_to_apply_for_heading(run)
+        return super(PyDocXTextExporter, self).get_run_styles_to_apply(run)
 
     def get_run_styles_to_apply_for_heading(self, run):
-        allowed_handlers = {self.export_run_property_italic, self.export_run_property_hidden,
-                            self.export_run_property_vanish}
-
         handlers = super(PyDocXTextExporter, self).get_run_styles_to_apply(run)
         for handler in handlers:
-            if handler in allowed_handlers:
+            if handler in self.heading_run_styles:
                 yield handler
 
     def export_run_property(self, tag, run, results):
@@ -541,6 +1096,9 @@ class PyDocXTextExporter(PyDocXExporter):
         return self.export_run_property(tag, run, results)
 
     def export_run_property_underline(self, run, results):
+        if self.context.hyperlink_depth:
+            # Hyperlinks are not underlined
+            return results
         attrs = {
             'class': 'pydocx-underline',
         }
@@ -647,13 +1205,15 @@ class PyDocXTextExporter(PyDocXExporter):
         if tag:
             results = tag.apply(results, allow_empty=False)
 
-        # Prevent underline style from applying by temporarily monkey-patching
-        # the export underline function. There's got to be a better way.
-        old = self.export_run_property_underline
-        self.export_run_property_underline = lambda run, results: results
-        for result in results:
-            yield result
-        self.export_run_property_underline = old
+        # Prevent underline style from applying within the hyperlink. Keep a
+        # reference to the context, the generator may be closed outside of it.
+        context = self.context
+        context.hyperlink_depth += 1
+        try:
+            for result in results:
+                yield result
+        finally:
+            context.hyperlink_depth -= 1
 
     def get_break_tag(self, br):
         if br.is_page_break():
@@ -677,6 +1237,8 @@ class PyDocXTextExporter(PyDocXExporter):
     def export_table(self, table):
         table_cell_spans = table.calculate_table_cell_spans()
         self.table_cell_rowspan_tracking[table] = table_cell_spans
+        if not self.first_pass:
+            self.context.table_count += 1
         results = super(PyDocXTextExporter, self).export_table(table)
         tag = self.get_table_tag(table)
         return tag.apply(results)
@@ -705,7 +1267,7 @@ class PyDocXTextExporter(PyDocXExporter):
 
         tag = None
         if start_new_tag:
-            parent_table = table_cell.get_first_ancestor(wordprocessing.Table)
+            parent_table = self.context.table
             rowspan_counts = self.table_cell_rowspan_tracking[parent_table]
             rowspan = rowspan_counts.get(table_cell, 1)
             attrs = {}
@@ -723,10 +1285,11 @@ class PyDocXTextExporter(PyDocXExporter):
         if tag:
             results = tag.apply(results)
 
-        self.in_table_cell = True
+        context = self.context
+        context.in_table_cell = True
         for result in results:
             yield result
-        self.in_table_cell = False
+        context.in_table_cell = False
 
     def export_drawing(self, drawing):
         length, width = drawing.get_picture_extents()
@@ -755,25 +1318,93 @@ class PyDocXTextExporter(PyDocXExporter):
         if tag:
             yield tag
 
-    def get_image_source(self, image):
+    def read_image(self, image):
+        self.count_image_bytes(image)
+        image.stream.seek(0)
+        return image.stream.read()
+
+    def count_image_bytes(self, image):
+        # Checked before the image is decompressed
+        context = self.context
+        context.image_bytes += self.document.package.get_part_size(image.uri)
+        ExportLimits.check(
+            'max_image_bytes',
+            self.limits.max_image_bytes,
+            context.image_bytes,
+        )
+
+    def resample_image(self, image, width, height):
+        """
+        Return a future of the image resampled to `width` x `height` pixels,
+        or None if the image is not resampled.
+        """
+        if self.image_resampler is None or image is None:
+            return
+        context = self.context
+        if uri_is_external(image.uri) or context.image_references:
+            return
+        key = (image.uri, width, height)
+        resampled = context.resampled_images.get(key)
+        if resampled is not None:
+            self.count_image_bytes(image)
+            return resampled
+        width_px = convert_length_to_pixels(width)
+        height_px = convert_length_to_pixels(height)
+        if not width_px or not height_px:
+            return
+        resampled = self.image_resampler.submit(self.read_image(image), width_px, height_px)
+        context.resampled_images[key] = resampled
+        return resampled
+
+    def get_image_source_by_uri(self, uri):
+        """
+        Return the inlined image source of the image part at `uri`, as
+        referenced in the `image_references` mode.
+        """
+        part = self.document.package.get_part(uri)
+        if part is None:
+            return
+        return self.get_inline_image_source(part)
+
+    def get_image_source(self, image, width=None, height=None):
         if image is None:
             return
         elif uri_is_external(image.uri):
             return image.uri
+        elif self.context.image_references:
+            return self.escape(image.uri)
         else:
-            image.stream.seek(0)
-            data = image.stream.read()
+            return self.get_inline_image_source(image, width=width, height=height)
+
+    def get_inline_image_source(self, image, width=None, height=None):
+        data = None
+        resampled = self.resample_image(image, width, height)
+        if resampled is not None:
+            try:
+                data = resampled.result()
+                extension = self.image_resampler.extension
+            except Exception:
+                # Not an image format the resampler can read (e.g. EMF)
+                data = None
+        if data is None:
+            data = self.read_image(image)
             _, filename = posixpath.split(image.uri)
             extension = filename.split('.')[-1].lower()
-            b64_encoded_src = 'data:image/{ext};base64,{data}'.format(
-                ext=extension,
-                data=base64.b64encode(data).decode(),
-            )
-            return self.escape(b64_encoded_src)
+        b64_encoded_src = 'data:image/{ext};base64,{data}'.format(
+            ext=extension,
+            data=base64.b64encode(data).decode(),
+        )
+        return self.escape(b64_encoded_src)
 
     def get_image_tag(self, image, width=None, height=None, rotate=None):
-        image_src = self.get_image_source(image)
+        if self.first_pass:
+            # The tag is discarded in the first pass, but start resampling so
+            # it runs in the background until the image is rendered
+            self.resample_image(image, width, height)
+            return
+        image_src = self.get_image_source(image, width=width, height=height)
         if image_src:
+            self.context.image_count += 1
             attrs = {
                 'src': image_src
             }
@@ -825,9 +1456,7 @@ class PyDocXTextExporter(PyDocXExporter):
             yield result
 
     def export_footnote_reference_mark(self, footnote_reference_mark):
-        footnote_parent = footnote_reference_mark.get_first_ancestor(
-            wordprocessing.Footnote,
-        )
+        footnote_parent = self.context.footnote
         if not footnote_parent:
             return
 
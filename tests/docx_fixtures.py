@@ -0,0 +1,126 @@
+import io
+import struct
+import zipfile
+import zlib
+
+CONTENT_TYPES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Default Extension="png" ContentType="image/png"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>'''
+
+PACKAGE_RELATIONSHIPS = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>'''
+
+DOCUMENT_RELATIONSHIPS = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink" Target="https://example.com/" TargetMode="External"/>
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image1.png"/>
+</Relationships>'''
+
+STYLES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/></w:style>
+</w:styles>'''
+
+DOCUMENT = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document
+ xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+ xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+ xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"
+ xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">
+<w:body>{body}</w:body>
+</w:document>'''
+
+IMAGE = '''<w:r><w:drawing><wp:inline>
+<wp:extent cx="914400" cy="914400"/>
+<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">
+<pic:pic>
+<pic:blipFill><a:blip r:embed="rId3"/></pic:blipFill>
+<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="914400" cy="914400"/></a:xfrm></pic:spPr>
+</pic:pic>
+</a:graphicData></a:graphic>
+</wp:inline></w:drawing></w:r>'''
+
+
+def make_png(width=2, height=2):
+    rows = b''.join(b'\x00' + b'\x80\x40\x20' * width for _ in range(height))
+
+    def chunk(chunk_type, data):
+        return (
+            struct.pack('>I', len(data)) + chunk_type + data +
+            struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
+        )
+
+    return (
+        b'\x89PNG\r\n\x1a\n' +
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+        chunk(b'IDAT', zlib.compress(rows)) +
+        chunk(b'IEND', b'')
+    )
+
+
+def paragraph(text='', style=None, bold=False, italic=False):
+    properties = ''
+    if style:
+        properties = '<w:pPr><w:pStyle w:val="{style}"/></w:pPr>'.format(style=style)
+    run_properties = ''
+    if bold or italic:
+        run_properties = '<w:rPr>{bold}{italic}</w:rPr>'.format(
+            bold='<w:b/>' if bold else '',
+            italic='<w:i/>' if italic else '',
+        )
+    run = ''
+    if text:
+        run = '<w:r>{properties}<w:t xml:space="preserve">{text}</w:t></w:r>'.format(
+            properties=run_properties,
+            text=text,
+        )
+    return '<w:p>{properties}{run}</w:p>'.format(properties=properties, run=run)
+
+
+def image_paragraph():
+    return '<w:p>{image}</w:p>'.format(image=IMAGE)
+
+
+def heading(text, level=1):
+    return paragraph(text, style='Heading{level}'.format(level=level))
+
+
+def header(empty_paragraphs=0):
+    """
+    The metadata header `DocxDto.extract_metadata_from_content` reads, with
+    `empty_paragraphs` empty paragraphs after its first line.
+    """
+    return ''.join(
+        [paragraph('Originalskript des Vortrags')] +
+        [paragraph() for _ in range(empty_paragraphs)] +
+        [
+            paragraph('Titel'),
+            paragraph('Ort, 2013-06-01'),
+            paragraph('Code: ID0001'),
+            paragraph('Typ: Vortrag'),
+            paragraph('Kategorie: Test'),
+            image_paragraph(),
+        ]
+    )
+
+
+def make_docx(body):
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w') as docx:
+        docx.writestr('[Content_Types].xml', CONTENT_TYPES)
+        docx.writestr('_rels/.rels', PACKAGE_RELATIONSHIPS)
+        docx.writestr('word/_rels/document.xml.rels', DOCUMENT_RELATIONSHIPS)
+        docx.writestr('word/styles.xml', STYLES)
+        docx.writestr('word/media/image1.png', make_png())
+        docx.writestr('word/document.xml', DOCUMENT.format(body=body))
+    return output.getvalue()
@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from async_export import export_batch_async
+from docx_dto import DocxDto
+from docx_fixtures import header, make_docx, paragraph
+
+
+def make_document(text):
+    return make_docx(header() + paragraph(text))
+
+
+async def collect(sources, **kwargs):
+    results = {}
+    async for source, result in export_batch_async(sources, **kwargs):
+        results[source] = result
+    return results
+
+
+def test_export_batch_async_exports_bytes_and_paths(tmp_path):
+    path = tmp_path / 'document.docx'
+    path.write_bytes(make_document('from a path'))
+    data = make_document('from bytes')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = asyncio.run(collect([str(path), data], executor=executor))
+
+    assert isinstance(results[str(path)], DocxDto)
+    assert results[str(path)].content[0].to_text() == 'from a path'
+    assert results[data].content[0].to_text() == 'from bytes'
+
+
+def test_export_batch_async_returns_errors_as_results():
+    valid = make_document('valid')
+    # The metadata header is missing
+    invalid = make_docx(paragraph('invalid'))
+
+    async def sources():
+        for source in (invalid, valid):
+            yield source
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = asyncio.run(collect(sources(), concurrency=1, executor=executor))
+
+    assert isinstance(results[invalid], IndexError)
+    assert isinstance(results[valid], DocxDto)
+
+
+def test_export_batch_async_cancels_pending_exports_when_closed():
+    sources = [make_document(str(index)) for index in range(8)]
+
+    async def export_first():
+        batch = export_batch_async(sources, concurrency=4, executor=executor)
+        first = await batch.__anext__()
+        await batch.aclose()
+        pending = [
+            task for task in asyncio.all_tasks()
+            if task is not asyncio.current_task() and not task.done()
+        ]
+        return first, pending
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        (_, result), pending = asyncio.run(export_first())
+
+    assert isinstance(result, DocxDto)
+    assert pending == []
+
+
+def test_export_batch_async_rejects_a_concurrency_below_one():
+    with pytest.raises(ValueError, match='concurrency'):
+        asyncio.run(collect([make_document('text')], concurrency=0))
@@ -0,0 +1,115 @@
+import io
+
+from docx_fixtures import header, heading, make_docx, paragraph
+from pydocx_text_exporter import PyDocXTextExporter
+
+
+class CountingExporter(PyDocXTextExporter):
+    def __init__(self, *args, **kwargs):
+        super(CountingExporter, self).__init__(*args, **kwargs)
+        self.exported_paragraphs = 0
+
+    def export_paragraph(self, paragraph):
+        self.exported_paragraphs += 1
+        return super(CountingExporter, self).export_paragraph(paragraph)
+
+
+def make_document(empty_header_paragraphs=1):
+    return make_docx(''.join([
+        header(empty_paragraphs=empty_header_paragraphs),
+        heading('One'),
+        paragraph('p0'),
+        paragraph(),
+        paragraph('p1'),
+        heading('Two', level=2),
+        paragraph('p2'),
+        heading('Three'),
+        paragraph('p3'),
+        paragraph('p4'),
+    ]))
+
+
+def export(data, **kwargs):
+    with CountingExporter(io.BytesIO(data)) as exporter:
+        docx = exporter.export_to_docx_dto(**kwargs)
+    texts = [paragraph.to_text() for paragraph in docx.content]
+    outline = [(heading.title, heading.paragraph_index) for heading in docx.outline]
+    return docx, texts, outline, exporter.exported_paragraphs
+
+
+def test_full_export_skips_the_header():
+    docx, texts, outline, _ = export(make_document())
+
+    assert docx.metadata.title == 'Titel'
+    assert docx.metadata.id == 'ID0001'
+    assert texts == ['p0', 'p1', 'p2', 'p3', 'p4']
+    assert outline == [('One', 0), ('Two', 2), ('Three', 3)]
+
+
+def test_range_counts_body_elements_after_the_header():
+    for empty_header_paragraphs in (0, 1, 3):
+        data = make_document(empty_header_paragraphs=empty_header_paragraphs)
+
+        docx, texts, outline, _ = export(data, paragraph_range=(1, 5))
+
+        assert docx.metadata.title == 'Titel'
+        # The empty paragraph is selected, but not exported
+        assert texts == ['p0', 'p1']
+        assert outline == [('Two', 2)]
+
+
+def test_range_skips_the_elements_outside_of_it():
+    data = make_document()
+    _, _, _, exported_paragraphs = export(data)
+
+    _, texts, _, range_exported_paragraphs = export(data, paragraph_range=(0, 2))
+
+    assert texts == ['p0']
+    # Twice (first and rendering pass) the 8 header and 2 selected paragraphs
+    assert range_exported_paragraphs == 2 * (8 + 2)
+    assert range_exported_paragraphs < exported_paragraphs
+
+
+def test_section_ends_at_a_heading_of_the_same_level():
+    _, texts, outline, _ = export(make_document(), section='One')
+
+    assert texts == ['p0', 'p1', 'p2']
+    assert outline == [('One', 0), ('Two', 2)]
+
+
+def test_section_of_a_subheading():
+    _, texts, outline, _ = export(make_document(), section=' Two ')
+
+    assert texts == ['p2']
+    assert outline == [('Two', 0)]
+
+
+def test_unknown_section_is_empty():
+    docx, texts, outline, _ = export(make_document(), section='Four')
+
+    assert docx.metadata.title == 'Titel'
+    assert texts == []
+    assert outline == []
+
+
+def test_heading_titles_are_unescaped_without_hidden_text():
+    hidden_heading = (
+        '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+        '<w:r><w:t xml:space="preserve">Q&amp;A &lt;intro&gt;</w:t></w:r>'
+        '<w:r><w:rPr><w:vanish/></w:rPr><w:t xml:space="preserve"> secret</w:t></w:r>'
+        '</w:p>'
+    )
+    data = make_docx(''.join([
+        header(),
+        hidden_heading,
+        paragraph('p0'),
+        heading('Next'),
+        paragraph('p1'),
+    ]))
+
+    _, _, outline, _ = export(data)
+    assert outline == [('Q&A <intro>', 0), ('Next', 1)]
+
+    _, texts, outline, _ = export(data, section='Q&A <intro>')
+    assert texts == ['p0']
+    assert outline == [('Q&A <intro>', 0)]
@@ -0,0 +1,72 @@
+import io
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from docx_fixtures import make_docx
+from pydocx_text_exporter import HtmlTag, PyDocXTextExporter
+
+PARAGRAPH = '''<w:p>
+<w:r><w:t xml:space="preserve">Paragraph {index} </w:t></w:r>
+<w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">bold </w:t></w:r>
+<w:r><w:rPr><w:i/></w:rPr><w:t>italic</w:t></w:r>
+<w:hyperlink r:id="rId2"><w:r><w:rPr><w:u w:val="single"/></w:rPr><w:t>link</w:t></w:r></w:hyperlink>
+</w:p>'''
+
+TABLE = '''<w:tbl>
+<w:tr>
+<w:tc><w:tcPr><w:vMerge w:val="restart"/></w:tcPr><w:p><w:r><w:t>Merged {index}</w:t></w:r></w:p></w:tc>
+<w:tc><w:p><w:r><w:t>a</w:t></w:r></w:p></w:tc>
+</w:tr>
+<w:tr>
+<w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p/></w:tc>
+<w:tc><w:p><w:r><w:rPr><w:b/></w:rPr><w:t>b</w:t></w:r></w:p></w:tc>
+</w:tr>
+</w:tbl>'''
+
+
+def make_document(sections=50):
+    return make_docx(''.join(
+        PARAGRAPH.format(index=index) + TABLE.format(index=index)
+        for index in range(sections)
+    ))
+
+
+def to_html(result):
+    if isinstance(result, HtmlTag):
+        return result.to_html()
+    return result
+
+
+def export_single_threaded(data):
+    with PyDocXTextExporter(io.BytesIO(data)) as exporter:
+        return exporter.export()
+
+
+def test_interleaved_exports_match_a_single_export():
+    data = make_document()
+    expected = export_single_threaded(data)
+
+    with PyDocXTextExporter(io.BytesIO(data)) as exporter:
+        first = exporter.yield_export_results()
+        second = exporter.yield_export_results()
+        first_results = []
+        second_results = []
+        for first_result, second_result in itertools.zip_longest(first, second):
+            if first_result is not None:
+                first_results.append(to_html(first_result))
+            if second_result is not None:
+                second_results.append(to_html(second_result))
+
+    assert ''.join(first_results) == expected
+    assert ''.join(second_results) == expected
+
+
+def test_threads_sharing_an_exporter_match_a_single_export():
+    data = make_document()
+    expected = export_single_threaded(data)
+
+    with PyDocXTextExporter(io.BytesIO(data)) as exporter:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: exporter.export(), range(32)))
+
+    assert all(result == expected for result in results)
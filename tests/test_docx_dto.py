@@ -0,0 +1,99 @@
+from docx_dto import DocxDto, Heading, Paragraph, TextSpan
+
+
+def make_paragraph(text):
+    return Paragraph([TextSpan(text)])
+
+
+def make_header():
+    return [
+        make_paragraph('Originalskript des Vortrags'),
+        make_paragraph('Titel'),
+        make_paragraph('Ort, 2013-06-01'),
+        make_paragraph('Code: ID0001'),
+        make_paragraph('Typ: Vortrag'),
+        make_paragraph('Kategorie: Test'),
+        make_paragraph('<img src="/word/media/image1.png" width="96px"/>'),
+    ]
+
+
+def test_extract_metadata_from_content():
+    docx = DocxDto(content=make_header() + [make_paragraph('p0')])
+
+    docx.extract_metadata_from_content()
+
+    assert vars(docx.metadata) == {
+        'id': 'ID0001',
+        'title': 'Titel',
+        'date': '2013-06-01',
+        'location': 'Ort',
+        'type': 'Vortrag',
+        'category': 'Test',
+        'img': '/word/media/image1.png',
+    }
+    assert [paragraph.to_text() for paragraph in docx.content] == ['p0']
+
+
+def test_extract_metadata_from_content_shifts_the_outline():
+    header_count = DocxDto.metadata_paragraph_count
+    docx = DocxDto(
+        content=make_header() + [make_paragraph('p0'), make_paragraph('p1')],
+        outline=[
+            Heading(level=1, title='In the header', paragraph_index=2),
+            Heading(level=1, title='One', paragraph_index=header_count),
+            Heading(level=2, title='Two', paragraph_index=header_count + 1),
+            Heading(level=1, title='End', paragraph_index=header_count + 2),
+        ],
+    )
+
+    docx.extract_metadata_from_content()
+
+    assert [(heading.title, heading.paragraph_index) for heading in docx.outline] == [
+        ('One', 0),
+        ('Two', 1),
+        # A heading at the end points past the last paragraph
+        ('End', 2),
+    ]
+
+
+def normalize(*spans):
+    paragraph = Paragraph([TextSpan(text, text_style=text_style) for text, text_style in spans])
+    paragraph.normalize_spans()
+    return [(span.text, span.text_style) for span in paragraph.text_spans]
+
+
+def test_normalize_spans_merges_adjacent_spans_of_the_same_style():
+    assert normalize(
+        ('a', ''),
+        ('b', ''),
+        ('c', 'strong'),
+        ('d', 'strong'),
+        ('e', ''),
+    ) == [('ab', ''), ('cd', 'strong'), ('e', '')]
+
+
+def test_normalize_spans_folds_whitespace_into_the_previous_span():
+    assert normalize(
+        ('bold', 'strong'),
+        (' ', 'em'),
+        ('bolder', 'strong'),
+        ('  ', ''),
+        ('plain', ''),
+    ) == [('bold bolder  ', 'strong'), ('plain', '')]
+
+
+def test_normalize_spans_folds_leading_whitespace_into_the_next_span():
+    assert normalize(
+        (' ', 'strong'),
+        ('\t', ''),
+        ('text', 'em'),
+    ) == [(' \ttext', 'em')]
+
+
+def test_normalize_spans_keeps_a_whitespace_only_paragraph():
+    assert normalize((' ', 'strong'), (' ', 'em')) == [('  ', '')]
+
+
+def test_normalize_spans_drops_empty_spans():
+    assert normalize(('', 'strong'), ('a', ''), ('', 'em'), ('b', '')) == [('ab', '')]
+    assert normalize() == []